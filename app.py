@@ -1,20 +1,39 @@
 from __future__ import annotations
 
+import atexit
 import csv
+import gzip
+import hashlib
+import io
 import os
+import queue
+import re
+import signal
+import sys
+import threading
+import time
 from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
+from types import MappingProxyType
+from typing import Mapping, NamedTuple
 
 from flask import (
     Flask,
     Response,
     abort,
-    redirect,
-    render_template_string,
     request,
+    send_file,
     send_from_directory,
     url_for,
 )
+from jinja2 import DictLoader, Template
+from markupsafe import Markup
+
+try:  # optional: pip install brotli
+    import brotli
+except ImportError:
+    brotli = None
 
 """
 J Supreme Marketing — Single-file Flask website (SEO + ad-ready)
@@ -29,9 +48,17 @@ J Supreme Marketing — Single-file Flask website (SEO + ad-ready)
 
 RUN LOCAL
 1) pip install flask
-2) python app.py
+2) python app.py             (FLASK_DEBUG=1 for the reloader + debugger)
 3) Open http://127.0.0.1:5000
 
+RUN PRODUCTION
+1) pip install flask gunicorn   (optional: brotli, for br-compressed pages)
+2) gunicorn app:app          (settings come from ./gunicorn.conf.py)
+3) Put nginx in front with `sendfile on;` — gunicorn also passes static
+   files to sendfile(2) via wsgi.file_wrapper.
+4) Optional: PAGE_SPOOL_DIR=/dev/shm/jsm serves the cached pages from files
+   the same way; add USE_X_SENDFILE=1 if the front server honours X-Sendfile.
+
 FOLDER SETUP
 your_project/
   app.py
@@ -60,26 +87,63 @@ ADSENSE (optional)
 APP_NAME = "J Supreme Marketing"
 SLOGAN = "Strategy · Execution · Distribution"
 
-CANONICAL_DOMAIN = os.getenv("CANONICAL_DOMAIN", "").strip()  # e.g. https://yourdomain.com
-LEADS_CSV = Path(os.getenv("LEADS_CSV", "leads.csv"))
-NEWSLETTER_CSV = Path(os.getenv("NEWSLETTER_CSV", "newsletter.csv"))
 
-INCLUDE_PIXELS = bool(os.getenv("INCLUDE_PIXELS", "").strip())
+class Config(NamedTuple):
+    """Environment settings, read once at import and never mutated."""
+
+    canonical_domain: str  # e.g. https://yourdomain.com
+    leads_csv: Path
+    newsletter_csv: Path
+    include_pixels: bool
+    adsense_enabled: bool  # ADSENSE_ENABLED set *and* a client ID given
+    adsense_client: str  # example: ca-pub-1234567890123456
+    adsense_slot_header: str
+    adsense_slot_inarticle: str
+    adsense_slot_sidebar: str
+    page_spool_dir: str  # optional: serve cached pages from files here
+    use_x_sendfile: bool  # let the front server send those files
+
+
+def _env(name: str, default: str = "") -> str:
+    return os.getenv(name, default).strip()
+
+
+def load_config() -> Config:
+    adsense_client = _env("ADSENSE_CLIENT")
+    return Config(
+        canonical_domain=_env("CANONICAL_DOMAIN"),
+        leads_csv=Path(os.getenv("LEADS_CSV", "leads.csv")),
+        newsletter_csv=Path(os.getenv("NEWSLETTER_CSV", "newsletter.csv")),
+        include_pixels=bool(_env("INCLUDE_PIXELS")),
+        adsense_enabled=bool(_env("ADSENSE_ENABLED")) and bool(adsense_client),
+        adsense_client=adsense_client,
+        adsense_slot_header=_env("ADSENSE_SLOT_HEADER"),
+        adsense_slot_inarticle=_env("ADSENSE_SLOT_INARTICLE"),
+        adsense_slot_sidebar=_env("ADSENSE_SLOT_SIDEBAR"),
+        page_spool_dir=_env("PAGE_SPOOL_DIR"),
+        use_x_sendfile=bool(_env("USE_X_SENDFILE")),
+    )
+
 
-ADSENSE_ENABLED = bool(os.getenv("ADSENSE_ENABLED", "").strip())
-ADSENSE_CLIENT = os.getenv("ADSENSE_CLIENT", "").strip()  # example: ca-pub-1234567890123456
-ADSENSE_SLOT_HEADER = os.getenv("ADSENSE_SLOT_HEADER", "").strip()
-ADSENSE_SLOT_INARTICLE = os.getenv("ADSENSE_SLOT_INARTICLE", "").strip()
-ADSENSE_SLOT_SIDEBAR = os.getenv("ADSENSE_SLOT_SIDEBAR", "").strip()
+CONFIG = load_config()
 
-# Image folders:
-STATIC_IMG_DIR = Path.cwd() / "static" / "img"
+# Asset folders (resolved once at startup):
+STATIC_DIR = Path.cwd() / "static"
+STATIC_IMG_DIR = STATIC_DIR / "img"
 IMAGES_DIR = Path.cwd() / "images"
 
+# Versioned static URLs (?v=<mtime>, see BG_URLS) change whenever the file
+# does, so they can be cached for good; plain /static/ URLs revalidate.
+STATIC_MAX_AGE = 31536000  # one year, in seconds
+STATIC_REVALIDATE_AGE = 3600
+# Pre-rendered pages are revalidated with their ETag after this.
+HTML_MAX_AGE = 3600
+
 # -----------------------
 # App
 # -----------------------
 app = Flask(__name__, static_folder=None)  # We'll serve /static ourselves
+app.config["USE_X_SENDFILE"] = CONFIG.use_x_sendfile
 
 # -----------------------
 # Simple Blog Posts (edit these anytime)
@@ -119,47 +183,195 @@ BLOG_POSTS = [
     },
 ]
 
+# Read-only slug index, so request code can't mutate it by accident.
+BLOG_POSTS_BY_SLUG: Mapping[str, dict] = MappingProxyType({p["slug"]: p for p in BLOG_POSTS})
+
 # -----------------------
 # Helpers
 # -----------------------
 def site_url(path: str = "/") -> str:
-    if CANONICAL_DOMAIN:
-        return CANONICAL_DOMAIN.rstrip("/") + path
+    if CONFIG.canonical_domain:
+        return CONFIG.canonical_domain.rstrip("/") + path
     return path
 
 
-def now_iso() -> str:
-    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+@lru_cache(maxsize=1)
+def _iso_for_second(second: int) -> str:
+    return datetime.fromtimestamp(second, timezone.utc).isoformat(timespec="seconds")
 
 
-def ensure_csv_header(path: Path, header: list[str]) -> None:
-    if not path.exists():
-        with path.open("w", newline="", encoding="utf-8") as f:
-            w = csv.writer(f)
-            w.writerow(header)
+def now_iso() -> str:
+    # Rows written within the same second share one formatted timestamp.
+    return _iso_for_second(int(time.time()))
+
+
+LEADS_HEADER = [
+    "created_at_utc",
+    "name",
+    "email",
+    "company",
+    "website",
+    "budget",
+    "goal",
+    "message",
+    "source",
+    "ip",
+    "user_agent",
+]
+NEWSLETTER_HEADER = ["created_at_utc", "email", "source", "ip", "user_agent"]
+
+
+# CSV files are opened once per process with O_APPEND and written with raw
+# os.write() calls: the kernel appends each write whole, so concurrent
+# threads and server workers never interleave rows and no lock is needed.
+# Requests only enqueue rows; a background thread writes them in batches,
+# with one fsync per file per batch. If a background write fails, later
+# rows for that file are written inline so the error reaches the request.
+CSV_QUEUE_SIZE = 10000
+CSV_FLUSH_ROWS = 64
+CSV_FLUSH_INTERVAL = 0.05  # seconds
+
+_csv_fds: dict[Path, int] = {}
+_csv_failed: set[Path] = set()  # files whose last background write failed
+_csv_queue: queue.Queue = queue.Queue(maxsize=CSV_QUEUE_SIZE)
+_csv_flusher: threading.Thread | None = None
+_csv_flusher_lock = threading.Lock()
+
+
+def csv_bytes(rows: list[list[str]]) -> bytes:
+    buf = io.StringIO()
+    csv.writer(buf).writerows(rows)
+    return buf.getvalue().encode("utf-8")
+
+
+def _write_all(fd: int, data: bytes) -> None:
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view) :]
+
+
+def _csv_fd(path: Path, header: list[str]) -> int:
+    fd = _csv_fds.get(path)
+    if fd is None:
+        # O_EXCL: only the thread/worker that creates the file writes the
+        # header, so concurrent first writes can't add a second header row.
+        try:
+            new_fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+        except FileExistsError:
+            pass
+        else:
+            try:
+                _write_all(new_fd, csv_bytes([header]))
+            finally:
+                os.close(new_fd)
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND)
+        existing = _csv_fds.setdefault(path, fd)
+        if existing != fd:
+            os.close(fd)
+            fd = existing
+    return fd
+
+
+def _write_file(path: Path, header: list[str], rows: list[list[str]], sync: bool) -> None:
+    fd = _csv_fd(path, header)
+    _write_all(fd, csv_bytes(rows))
+    if sync:
+        os.fsync(fd)
+
+
+def _commit_batch(batch: list[tuple[Path, list[str], list[str]]], sync: bool = True) -> None:
+    # One write (and fsync) per file; a failing file never blocks the others.
+    by_path: dict[Path, tuple[list[str], list[list[str]]]] = {}
+    for path, header, row in batch:
+        by_path.setdefault(path, (header, []))[1].append(row)
+    for path, (header, rows) in by_path.items():
+        try:
+            _write_file(path, header, rows, sync)
+        except Exception:
+            _csv_failed.add(path)
+            app.logger.exception("Could not write %d row(s) to %s", len(rows), path)
+
+
+def _flush_loop() -> None:
+    while True:
+        item = _csv_queue.get()
+        if item is None:
+            return
+        batch = [item]
+        deadline = time.monotonic() + CSV_FLUSH_INTERVAL
+        while len(batch) < CSV_FLUSH_ROWS:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                item = _csv_queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if item is None:
+                _commit_batch(batch)
+                return
+            batch.append(item)
+        _commit_batch(batch)
+
+
+def _start_csv_flusher() -> None:
+    # Started lazily so forked server workers each get their own thread;
+    # restarted if it ever died.
+    global _csv_flusher
+    with _csv_flusher_lock:
+        if _csv_flusher is None or not _csv_flusher.is_alive():
+            _csv_flusher = threading.Thread(target=_flush_loop, name="csv-flusher", daemon=True)
+            _csv_flusher.start()
+
+
+@atexit.register
+def _shutdown_csv() -> None:
+    if _csv_flusher is not None and _csv_flusher.is_alive():
+        try:
+            _csv_queue.put(None, timeout=1)
+        except queue.Full:
+            pass
+        _csv_flusher.join(timeout=5)
+
+    leftover = []
+    while True:
+        try:
+            item = _csv_queue.get_nowait()
+        except queue.Empty:
+            break
+        if item is not None:
+            leftover.append(item)
+    _commit_batch(leftover)
+
+    while _csv_fds:
+        path, fd = _csv_fds.popitem()
+        try:
+            os.fsync(fd)
+        except OSError:
+            app.logger.exception("Could not sync %s", path)
+        finally:
+            os.close(fd)
 
 
 def save_row(path: Path, header: list[str], row: list[str]) -> None:
-    ensure_csv_header(path, header)
-    with path.open("a", newline="", encoding="utf-8") as f:
-        w = csv.writer(f)
-        w.writerow(row)
+    flusher = _csv_flusher
+    if flusher is None or not flusher.is_alive():
+        _start_csv_flusher()
+    if path in _csv_failed:
+        # Raises (a 500) while the file is still unwritable.
+        _write_file(path, header, [row], sync=True)
+        _csv_failed.discard(path)
+        return
+    # Opens the file on first use, so a bad path fails this request.
+    _csv_fd(path, header)
+    try:
+        _csv_queue.put_nowait((path, header, row))
+    except queue.Full:
+        # Backlogged; write inline rather than drop the submission.
+        _write_file(path, header, [row], sync=False)
 
 
 def save_lead(data: dict) -> None:
-    header = [
-        "created_at_utc",
-        "name",
-        "email",
-        "company",
-        "website",
-        "budget",
-        "goal",
-        "message",
-        "source",
-        "ip",
-        "user_agent",
-    ]
     row = [
         now_iso(),
         data.get("name", ""),
@@ -173,11 +385,10 @@ def save_lead(data: dict) -> None:
         data.get("ip", ""),
         data.get("user_agent", ""),
     ]
-    save_row(LEADS_CSV, header, row)
+    save_row(CONFIG.leads_csv, LEADS_HEADER, row)
 
 
 def save_subscriber(data: dict) -> None:
-    header = ["created_at_utc", "email", "source", "ip", "user_agent"]
     row = [
         now_iso(),
         data.get("email", ""),
@@ -185,59 +396,91 @@ def save_subscriber(data: dict) -> None:
         data.get("ip", ""),
         data.get("user_agent", ""),
     ]
-    save_row(NEWSLETTER_CSV, header, row)
+    save_row(CONFIG.newsletter_csv, NEWSLETTER_HEADER, row)
+
+
+def _list_files(folder: Path) -> dict[str, Path]:
+    if not folder.is_dir():
+        return {}
+    return {p.relative_to(folder).as_posix(): p for p in folder.rglob("*") if p.is_file()}
+
+
+# Listed once at startup (restart after adding images); ./static/img wins
+# over ./images when both have the same file.
+BG_PATH: dict[str, Path] = {**_list_files(IMAGES_DIR), **_list_files(STATIC_IMG_DIR)}
+
+BG_FILES = {
+    "home": "home_bg_1920x1080.jpg",
+    "insights": "insights_bg_1920x1080.jpg",
+    "start": "start_bg_1920x1080.jpg",
+    "privacy": "privacy_bg_1920x1080.jpg",
+    "terms": "terms_bg_1920x1080.jpg",
+    "thank_you": "thank_you_bg_1920x1080.jpg",
+    "blog": "insights_bg_1920x1080.jpg",
+}
+# The mtime version changes when an image is replaced under the same name.
+BG_URLS = {
+    page: f"/static/img/{filename}?v={BG_PATH[filename].stat().st_mtime_ns}"
+    for page, filename in BG_FILES.items()
+    if filename in BG_PATH
+}
 
 
 def find_bg_file(filename: str) -> Path | None:
-    p1 = STATIC_IMG_DIR / filename
-    if p1.exists():
-        return p1
-    p2 = IMAGES_DIR / filename
-    if p2.exists():
-        return p2
-    return None
+    return BG_PATH.get(filename)
 
 
 def bg_image_for(page: str) -> str | None:
-    mapping = {
-        "home": "home_bg_1920x1080.jpg",
-        "insights": "insights_bg_1920x1080.jpg",
-        "start": "start_bg_1920x1080.jpg",
-        "privacy": "privacy_bg_1920x1080.jpg",
-        "terms": "terms_bg_1920x1080.jpg",
-        "thank_you": "thank_you_bg_1920x1080.jpg",
-        "blog": "insights_bg_1920x1080.jpg",
-    }
-    filename = mapping.get(page)
-    if not filename:
-        return None
-    if find_bg_file(filename):
-        return f"/static/img/{filename}"
-    return None
+    return BG_URLS.get(page)
 
 
 def get_post(slug: str) -> dict | None:
-    for p in BLOG_POSTS:
-        if p["slug"] == slug:
-            return p
-    return None
+    return BLOG_POSTS_BY_SLUG.get(slug)
+
 
+def minify_css(css: str) -> str:
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    return re.sub(r"\s*([{};,])\s*", r"\1", css).strip()
+
+
+def minify_html(html: str) -> str:
+    """
+    Cheap import-time minifier for the layout template: squeezes the <style>
+    block and drops indentation/blank lines. Not safe for <pre>/<textarea>.
+    """
+    html = re.sub(
+        r"<style>(.*?)</style>",
+        lambda m: f"<style>{minify_css(m.group(1))}</style>",
+        html,
+        flags=re.S,
+    )
+    return re.sub(r"\n\s*", "\n", html).strip()
 
-def render_page(body_html: str, *, page: str, title: str, desc: str) -> str:
-    return render_template_string(
-        BASE,
-        app_name=APP_NAME,
-        slogan=SLOGAN,
+
+def extends_base(body: str) -> str:
+    return '{% extends "base.html" %}{% block content %}' + body + "{% endblock %}"
+
+
+@lru_cache(maxsize=None)
+def compile_page(body: str) -> Template:
+    return app.jinja_env.from_string(extends_base(body))
+
+
+def render_page(tmpl: Template | str, *, page: str, title: str, desc: str, **ctx) -> str:
+    """
+    Renders a page inside the layout. Pass a precompiled page template; a raw
+    body string also works and is compiled once, on first use.
+    """
+    if isinstance(tmpl, str):
+        tmpl = compile_page(tmpl)
+    return tmpl.render(
+        STATIC_CTX,
         meta_title=title,
         meta_desc=desc,
-        canonical=site_url(request.path),
-        include_pixels=INCLUDE_PIXELS,
-        adsense_enabled=ADSENSE_ENABLED and bool(ADSENSE_CLIENT),
-        adsense_client=ADSENSE_CLIENT,
-        adsense_slot_header=ADSENSE_SLOT_HEADER,
-        adsense_slot_inarticle=ADSENSE_SLOT_INARTICLE,
-        adsense_slot_sidebar=ADSENSE_SLOT_SIDEBAR,
-        body=render_template_string(body_html, hero_bg_url=bg_image_for(page)),
+        canonical=CANONICALS.get(request.path) or site_url(request.path),
+        hero_bg_url=bg_image_for(page),
+        **ctx,
     )
 
 
@@ -246,10 +489,10 @@ def render_page(body_html: str, *, page: str, title: str, desc: str) -> str:
 # -----------------------
 @app.route("/static/<path:filename>")
 def static_files(filename: str):
-    base = Path.cwd() / "static"
-    if not base.exists():
-        abort(404)
-    return send_from_directory(base, filename)
+    # send_from_directory() 404s on its own when the folder or file is missing.
+    return send_from_directory(
+        STATIC_DIR, filename, conditional=True, max_age=STATIC_REVALIDATE_AGE
+    )
 
 
 @app.route("/static/img/<path:filename>")
@@ -257,48 +500,80 @@ def static_img_files(filename: str):
     p = find_bg_file(filename)
     if not p:
         abort(404)
-    return send_from_directory(p.parent, p.name)
+    return send_from_directory(p.parent, p.name, conditional=True, max_age=STATIC_REVALIDATE_AGE)
+
+
+@app.after_request
+def static_cache_headers(response: Response) -> Response:
+    if (
+        request.path.startswith("/static/")
+        and response.status_code in (200, 206, 304)
+        and request.args.get("v")
+    ):
+        response.headers["Cache-Control"] = f"public, max-age={STATIC_MAX_AGE}, immutable"
+        # send_from_directory() set Expires for the short age; match the year.
+        response.expires = int(time.time()) + STATIC_MAX_AGE
+    return response
 
 
 # -----------------------
 # SEO: robots + sitemap
 # -----------------------
-@app.route("/robots.txt")
-def robots():
+# Both bodies only depend on module constants, so they are built (and
+# encoded) on the first hit and reused for the life of the process.
+@lru_cache(maxsize=1)
+def robots_body() -> bytes:
     lines = [
         "User-agent: *",
         "Allow: /",
         f"Sitemap: {site_url('/sitemap.xml')}",
     ]
-    return Response("\n".join(lines) + "\n", mimetype="text/plain")
+    return ("\n".join(lines) + "\n").encode("utf-8")
 
 
-@app.route("/sitemap.xml")
-def sitemap():
+@lru_cache(maxsize=1)
+def sitemap_body() -> bytes:
     pages = [
-        (site_url(url_for("home")), "weekly", "1.0"),
-        (site_url(url_for("insights")), "weekly", "0.7"),
-        (site_url(url_for("blog")), "weekly", "0.7"),
-        (site_url(url_for("start")), "monthly", "0.7"),
-        (site_url(url_for("privacy")), "yearly", "0.2"),
-        (site_url(url_for("terms")), "yearly", "0.2"),
-        (site_url(url_for("thank_you")), "yearly", "0.1"),
+        (site_url(URLS["home"]), "weekly", "1.0"),
+        (site_url(URLS["insights"]), "weekly", "0.7"),
+        (site_url(URLS["blog"]), "weekly", "0.7"),
+        (site_url(URLS["start"]), "monthly", "0.7"),
+        (site_url(URLS["privacy"]), "yearly", "0.2"),
+        (site_url(URLS["terms"]), "yearly", "0.2"),
+        (site_url(URLS["thank_you"]), "yearly", "0.1"),
     ]
 
     # Add blog posts
-    for p in BLOG_POSTS:
-        pages.append((site_url(url_for("blog_post", slug=p["slug"])), "monthly", "0.6"))
+    pages.extend(
+        (site_url(POST_URLS[p["slug"]]), "monthly", "0.6") for p in BLOG_POSTS
+    )
 
-    xml = ['<?xml version="1.0" encoding="UTF-8"?>']
-    xml.append('<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">')
-    for loc, changefreq, priority in pages:
-        xml.append("  <url>")
-        xml.append(f"    <loc>{loc}</loc>")
-        xml.append(f"    <changefreq>{changefreq}</changefreq>")
-        xml.append(f"    <priority>{priority}</priority>")
-        xml.append("  </url>")
-    xml.append("</urlset>")
-    return Response("\n".join(xml), mimetype="application/xml")
+    urls = [
+        "  <url>\n"
+        f"    <loc>{loc}</loc>\n"
+        f"    <changefreq>{changefreq}</changefreq>\n"
+        f"    <priority>{priority}</priority>\n"
+        "  </url>"
+        for loc, changefreq, priority in pages
+    ]
+    return "\n".join(
+        [
+            '<?xml version="1.0" encoding="UTF-8"?>',
+            '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">',
+            *urls,
+            "</urlset>",
+        ]
+    ).encode("utf-8")
+
+
+@app.route("/robots.txt")
+def robots():
+    return Response(robots_body(), mimetype="text/plain", direct_passthrough=True)
+
+
+@app.route("/sitemap.xml")
+def sitemap():
+    return Response(sitemap_body(), mimetype="application/xml", direct_passthrough=True)
 
 
 # -----------------------
@@ -632,18 +907,18 @@ BASE = r"""
 <body>
   <header>
     <div class="container topbar">
-      <a class="brand" href="{{ url_for('home') }}">{{ app_name }}</a>
+      <a class="brand" href="{{ urls.home }}">{{ app_name }}</a>
       <nav>
-        <a href="{{ url_for('home') }}#approach">Approach</a>
-        <a href="{{ url_for('home') }}#capabilities">Capabilities</a>
-        <a href="{{ url_for('home') }}#proof">Proof</a>
-        <a href="{{ url_for('blog') }}">Blog</a>
-        <a class="navcta" href="{{ url_for('start') }}">Start Conversation</a>
+        <a href="{{ urls.home }}#approach">Approach</a>
+        <a href="{{ urls.home }}#capabilities">Capabilities</a>
+        <a href="{{ urls.home }}#proof">Proof</a>
+        <a href="{{ urls.blog }}">Blog</a>
+        <a class="navcta" href="{{ urls.start }}">Start Conversation</a>
       </nav>
     </div>
   </header>
 
-  {{ body|safe }}
+  {% block content %}{% endblock %}
 
   <footer>
     <div class="container footer-inner">
@@ -652,13 +927,13 @@ BASE = r"""
         <div class="foottag">{{ slogan }}</div>
       </div>
       <div class="footlinks">
-        <a href="{{ url_for('insights') }}">Insights</a>
+        <a href="{{ urls.insights }}">Insights</a>
         <span class="dot">•</span>
-        <a href="{{ url_for('blog') }}">Blog</a>
+        <a href="{{ urls.blog }}">Blog</a>
         <span class="dot">•</span>
-        <a href="{{ url_for('privacy') }}">Privacy</a>
+        <a href="{{ urls.privacy }}">Privacy</a>
         <span class="dot">•</span>
-        <a href="{{ url_for('terms') }}">Terms</a>
+        <a href="{{ urls.terms }}">Terms</a>
         <span class="dot">•</span>
         <a href="mailto:jordanmorrisr@gmail.com">jordanmorrisr@gmail.com</a>
         <span class="dot">•</span>
@@ -670,27 +945,30 @@ BASE = r"""
 </html>
 """
 
-HERO_OPEN = r"""
+BASE_MIN = minify_html(BASE)
+
+# Shared hero wrapper: {% call hero(hero_bg_url) %}...{% endcall %}
+MACROS = r"""
+{% macro hero(bg_url) %}
 <main class="hero">
-  {% if hero_bg_url %}
-    <div class="hero-bg" style="background-image:url('{{ hero_bg_url }}');"></div>
+  {% if bg_url %}
+    <div class="hero-bg" style="background-image:url('{{ bg_url }}');"></div>
   {% else %}
     <div class="hero-bg fallback"></div>
   {% endif %}
   <div class="hero-overlay"></div>
   <div class="container hero-inner">
-"""
-
-HERO_CLOSE = r"""
+{{ caller() }}
   </div>
 </main>
+{% endmacro %}
 """
 
 NEWSLETTER_BLOCK = r"""
 <div class="newsletter">
   <div class="kicker">NEWSLETTER</div>
   <div class="hint">Short strategy dispatches—no spam. If it’s not useful, we won’t send it.</div>
-  <form method="post" action="{{ url_for('newsletter_subscribe') }}" style="margin:0; padding:0; border:none; background:transparent; max-width:none;">
+  <form method="post" action="{{ urls.newsletter_subscribe }}" style="margin:0; padding:0; border:none; background:transparent; max-width:none;">
     <div class="row">
       <input name="email" type="email" required placeholder="you@company.com" aria-label="Email address" />
       <button class="btn" type="submit">Subscribe</button>
@@ -705,7 +983,7 @@ def adsense_ad_unit(slot: str) -> str:
     Returns an AdSense ad unit HTML block (only used when enabled + slot set).
     Note: Actual slot IDs and client ID come from env vars.
     """
-    if not (ADSENSE_ENABLED and ADSENSE_CLIENT and slot):
+    if not (CONFIG.adsense_enabled and slot):
         return ""
 
     # Responsive ad unit example structure (Google provides variations).
@@ -714,7 +992,7 @@ def adsense_ad_unit(slot: str) -> str:
   <div class="adlabel">ADVERTISEMENT</div>
   <ins class="adsbygoogle"
        style="display:block"
-       data-ad-client="{ADSENSE_CLIENT}"
+       data-ad-client="{CONFIG.adsense_client}"
        data-ad-slot="{slot}"
        data-ad-format="auto"
        data-full-width-responsive="true"></ins>
@@ -723,14 +1001,23 @@ def adsense_ad_unit(slot: str) -> str:
 """.strip()
 
 
-HOME_BODY = HERO_OPEN + r"""
+# Client and slot IDs are fixed at startup, so each ad unit is a constant,
+# already marked safe for the templates.
+AD_HEADER_HTML = Markup(adsense_ad_unit(CONFIG.adsense_slot_header))
+AD_INARTICLE_HTML = Markup(adsense_ad_unit(CONFIG.adsense_slot_inarticle))
+AD_SIDEBAR_HTML = Markup(adsense_ad_unit(CONFIG.adsense_slot_sidebar))
+
+
+HOME_BODY = r"""
+{% from "macros.html" import hero %}
+{% call hero(hero_bg_url) %}
     <h1>We don’t chase.<br/>We appear, diagnose, and solve.</h1>
     <p class="sub">Strategy-led marketing for brands that need clarity—not noise.</p>
     <div class="actions">
-      <a class="btn" href="{{ url_for('start') }}">Request a Signal Audit</a>
-      <a class="link" href="{{ url_for('blog') }}">Read the blog →</a>
+      <a class="btn" href="{{ urls.start }}">Request a Signal Audit</a>
+      <a class="link" href="{{ urls.blog }}">Read the blog →</a>
     </div>
-""" + HERO_CLOSE + r"""
+{% endcall %}
 
 <section id="approach" class="strip">
   <div class="container strip-inner">
@@ -799,20 +1086,22 @@ HOME_BODY = HERO_OPEN + r"""
       <h3>If your brand feels noisy or underperforming—</h3>
       <p>That’s not a motivation problem. It’s a systems problem.</p>
     </div>
-    <a class="btn" href="{{ url_for('start') }}">Start with a conversation</a>
+    <a class="btn" href="{{ urls.start }}">Start with a conversation</a>
   </div>
 </section>
 """
 
 
-INSIGHTS_BODY = HERO_OPEN + r"""
+INSIGHTS_BODY = r"""
+{% from "macros.html" import hero %}
+{% call hero(hero_bg_url) %}
     <h1>Too many brands want attention.<br/>You deserve influence.</h1>
     <p class="sub">We help brands think in systems, seize signals, and become unignorable.</p>
     <div class="actions">
-      <a class="btn" href="{{ url_for('start') }}">Start Conversation</a>
-      <a class="link" href="{{ url_for('blog') }}">Read the blog →</a>
+      <a class="btn" href="{{ urls.start }}">Start Conversation</a>
+      <a class="link" href="{{ urls.blog }}">Read the blog →</a>
     </div>
-""" + HERO_CLOSE + r"""
+{% endcall %}
 <section class="section">
   <div class="container">
     <h2>Marketing dispatches</h2>
@@ -839,7 +1128,7 @@ INSIGHTS_BODY = HERO_OPEN + r"""
       </div>
     </div>
 
-    """ + NEWSLETTER_BLOCK + r"""
+    {% include "newsletter.html" %}
   </div>
 </section>
 """
@@ -855,7 +1144,7 @@ BLOG_LIST_BODY = r"""
       <div>
         {% for p in posts %}
           <div class="postcard" style="margin-bottom:12px;">
-            <a href="{{ url_for('blog_post', slug=p.slug) }}">
+            <a href="{{ post_urls[p.slug] }}">
               <div class="kicker">INSIGHT</div>
               <div class="title" style="font-weight:700; font-size:18px; margin-top:8px;">{{ p.title }}</div>
             </a>
@@ -872,13 +1161,13 @@ BLOG_LIST_BODY = r"""
           Request a Signal Audit and we’ll tell you what’s actually breaking conversions.
         </div>
         <div style="margin-top:12px;">
-          <a class="btn" href="{{ url_for('start') }}">Request a Signal Audit</a>
+          <a class="btn" href="{{ urls.start }}">Request a Signal Audit</a>
         </div>
 
-        """ + NEWSLETTER_BLOCK + r"""
+        {% include "newsletter.html" %}
 
         {% if ad_sidebar %}
-          <div style="margin-top:12px;">{{ ad_sidebar|safe }}</div>
+          <div style="margin-top:12px;">{{ ad_sidebar }}</div>
         {% endif %}
       </aside>
     </div>
@@ -897,7 +1186,7 @@ BLOG_POST_BODY = r"""
         <div class="postmeta">{{ post.date }}</div>
 
         {% if ad_header %}
-          <div style="margin-top:14px;">{{ ad_header|safe }}</div>
+          <div style="margin-top:14px;">{{ ad_header }}</div>
         {% endif %}
 
         <div class="postbody" style="margin-top:16px;">
@@ -905,11 +1194,11 @@ BLOG_POST_BODY = r"""
         </div>
 
         {% if ad_inarticle %}
-          <div style="margin-top:18px;">{{ ad_inarticle|safe }}</div>
+          <div style="margin-top:18px;">{{ ad_inarticle }}</div>
         {% endif %}
 
         <div style="margin-top:18px;">
-          <a class="link" href="{{ url_for('blog') }}">← Back to Blog</a>
+          <a class="link" href="{{ urls.blog }}">← Back to Blog</a>
         </div>
       </article>
 
@@ -919,10 +1208,10 @@ BLOG_POST_BODY = r"""
           Get short strategy dispatches and frameworks.
         </div>
 
-        """ + NEWSLETTER_BLOCK + r"""
+        {% include "newsletter.html" %}
 
         {% if ad_sidebar %}
-          <div style="margin-top:12px;">{{ ad_sidebar|safe }}</div>
+          <div style="margin-top:12px;">{{ ad_sidebar }}</div>
         {% endif %}
       </aside>
     </div>
@@ -937,7 +1226,7 @@ START_BODY = r"""
     <h1>Request a Signal Audit</h1>
     <p class="lead">This is a diagnosis-first intake. If you’re a fit, we’ll respond with next steps.</p>
 
-    <form method="post" action="{{ url_for('lead') }}">
+    <form method="post" action="{{ urls.lead }}">
       <div class="row2">
         <div>
           <label for="name">Name *</label>
@@ -1008,8 +1297,8 @@ THANKS_BODY = r"""
     <h1>Received.</h1>
     <p class="lead">Your Signal Audit request has been submitted.</p>
     <div class="actions" style="margin-top:18px;">
-      <a class="btn" href="{{ url_for('home') }}">Back to home</a>
-      <a class="link" href="{{ url_for('blog') }}">Read Blog →</a>
+      <a class="btn" href="{{ urls.home }}">Back to home</a>
+      <a class="link" href="{{ urls.blog }}">Read Blog →</a>
     </div>
   </div>
 </main>
@@ -1021,8 +1310,8 @@ NEWSLETTER_THANKS_BODY = r"""
     <h1>Subscribed.</h1>
     <p class="lead">You’re on the list. When we send, it’ll be short and actually useful.</p>
     <div class="actions" style="margin-top:18px;">
-      <a class="btn" href="{{ url_for('blog') }}">Read the Blog</a>
-      <a class="link" href="{{ url_for('home') }}">Back to home →</a>
+      <a class="btn" href="{{ urls.blog }}">Read the Blog</a>
+      <a class="link" href="{{ urls.home }}">Back to home →</a>
     </div>
   </div>
 </main>
@@ -1056,13 +1345,42 @@ TERMS_BODY = r"""
 </main>
 """
 
+# -----------------------
+# Compiled templates (parsed once at import, not per request)
+# -----------------------
+TEMPLATES = {
+    "base.html": BASE_MIN,
+    "macros.html": MACROS,
+    "newsletter.html": NEWSLETTER_BLOCK,
+    "home.html": extends_base(HOME_BODY),
+    "insights.html": extends_base(INSIGHTS_BODY),
+    "blog_list.html": extends_base(BLOG_LIST_BODY),
+    "blog_post.html": extends_base(BLOG_POST_BODY),
+    "start.html": extends_base(START_BODY),
+    "thank_you.html": extends_base(THANKS_BODY),
+    "newsletter_thanks.html": extends_base(NEWSLETTER_THANKS_BODY),
+    "privacy.html": extends_base(PRIVACY_BODY),
+    "terms.html": extends_base(TERMS_BODY),
+}
+app.jinja_loader = DictLoader(TEMPLATES)
+
+HOME_TMPL = app.jinja_env.get_template("home.html")
+INSIGHTS_TMPL = app.jinja_env.get_template("insights.html")
+BLOG_LIST_TMPL = app.jinja_env.get_template("blog_list.html")
+BLOG_POST_TMPL = app.jinja_env.get_template("blog_post.html")
+START_TMPL = app.jinja_env.get_template("start.html")
+THANKS_TMPL = app.jinja_env.get_template("thank_you.html")
+NEWSLETTER_THANKS_TMPL = app.jinja_env.get_template("newsletter_thanks.html")
+PRIVACY_TMPL = app.jinja_env.get_template("privacy.html")
+TERMS_TMPL = app.jinja_env.get_template("terms.html")
+
 # -----------------------
 # Routes
 # -----------------------
 @app.route("/")
 def home():
     return render_page(
-        HOME_BODY,
+        HOME_TMPL,
         page="home",
         title=f"{APP_NAME} | Strategy-led Marketing",
         desc="Strategy-led marketing: positioning, systems, and distribution that converts.",
@@ -1072,7 +1390,7 @@ def home():
 @app.route("/insights")
 def insights():
     return render_page(
-        INSIGHTS_BODY,
+        INSIGHTS_TMPL,
         page="insights",
         title=f"{APP_NAME} | Insights",
         desc="Marketing insights on positioning, systems, and distribution.",
@@ -1081,17 +1399,13 @@ def insights():
 
 @app.route("/blog")
 def blog():
-    # Render list via template vars
-    body = render_template_string(
-        BLOG_LIST_BODY,
-        posts=BLOG_POSTS,
-        ad_sidebar=adsense_ad_unit(ADSENSE_SLOT_SIDEBAR),
-    )
     return render_page(
-        body,
+        BLOG_LIST_TMPL,
         page="blog",
         title=f"{APP_NAME} | Blog",
         desc="Practical marketing strategy notes: positioning, systems, and distribution.",
+        posts=BLOG_POSTS,
+        ad_sidebar=AD_SIDEBAR_HTML,
     )
 
 
@@ -1101,25 +1415,22 @@ def blog_post(slug: str):
     if not post:
         abort(404)
 
-    body = render_template_string(
-        BLOG_POST_BODY,
-        post=post,
-        ad_header=adsense_ad_unit(ADSENSE_SLOT_HEADER),
-        ad_inarticle=adsense_ad_unit(ADSENSE_SLOT_INARTICLE),
-        ad_sidebar=adsense_ad_unit(ADSENSE_SLOT_SIDEBAR),
-    )
     return render_page(
-        body,
+        BLOG_POST_TMPL,
         page="blog",
         title=f"{APP_NAME} | {post['title']}",
         desc=post["excerpt"],
+        post=post,
+        ad_header=AD_HEADER_HTML,
+        ad_inarticle=AD_INARTICLE_HTML,
+        ad_sidebar=AD_SIDEBAR_HTML,
     )
 
 
 @app.route("/start")
 def start():
     return render_page(
-        START_BODY,
+        START_TMPL,
         page="start",
         title=f"{APP_NAME} | Request a Signal Audit",
         desc="Request a Signal Audit—diagnosis-first marketing for brands that want clarity and influence.",
@@ -1129,7 +1440,7 @@ def start():
 @app.route("/thank-you")
 def thank_you():
     return render_page(
-        THANKS_BODY,
+        THANKS_TMPL,
         page="thank_you",
         title=f"{APP_NAME} | Thank You",
         desc="Submission received.",
@@ -1139,7 +1450,7 @@ def thank_you():
 @app.route("/newsletter/thanks")
 def newsletter_thanks():
     return render_page(
-        NEWSLETTER_THANKS_BODY,
+        NEWSLETTER_THANKS_TMPL,
         page="insights",
         title=f"{APP_NAME} | Subscribed",
         desc="Newsletter subscribed.",
@@ -1149,7 +1460,7 @@ def newsletter_thanks():
 @app.route("/privacy")
 def privacy():
     return render_page(
-        PRIVACY_BODY,
+        PRIVACY_TMPL,
         page="privacy",
         title=f"{APP_NAME} | Privacy Policy",
         desc="Privacy policy for J Supreme Marketing.",
@@ -1159,59 +1470,262 @@ def privacy():
 @app.route("/terms")
 def terms():
     return render_page(
-        TERMS_BODY,
+        TERMS_TMPL,
         page="terms",
         title=f"{APP_NAME} | Terms",
         desc="Terms of service for J Supreme Marketing.",
     )
 
 
+# Lead form fields, with the value used when a field is missing or empty.
+LEAD_FIELDS = (
+    ("name", ""),
+    ("email", ""),
+    ("company", ""),
+    ("website", ""),
+    ("budget", ""),
+    ("goal", ""),
+    ("message", ""),
+    ("source", "website_form"),
+)
+# Upper bound on name + email + message; anything longer is junk or a bot.
+LEAD_MAX_CHARS = 8192
+
+
 @app.route("/api/lead", methods=["POST"])
 def lead():
-    name = (request.form.get("name") or "").strip()
-    email = (request.form.get("email") or "").strip()
-    message = (request.form.get("message") or "").strip()
+    form_get = request.form.get
+    payload = {field: (form_get(field) or default).strip() for field, default in LEAD_FIELDS}
 
-    if not name or not email or not message:
-        abort(400, "Missing required fields.")
+    name, email, message = payload["name"], payload["email"], payload["message"]
+    if not (name and email and message) or len(name) + len(email) + len(message) > LEAD_MAX_CHARS:
+        abort(400, "Missing or oversized fields.")
 
-    payload = {
-        "name": name,
-        "email": email,
-        "company": (request.form.get("company") or "").strip(),
-        "website": (request.form.get("website") or "").strip(),
-        "budget": (request.form.get("budget") or "").strip(),
-        "goal": (request.form.get("goal") or "").strip(),
-        "message": message,
-        "source": (request.form.get("source") or "website_form").strip(),
-        "ip": request.headers.get("X-Forwarded-For", request.remote_addr),
-        "user_agent": request.headers.get("User-Agent", ""),
-    }
+    # Read the two headers straight from the WSGI environ (plain dict lookups).
+    environ = request.environ
+    payload["ip"] = environ.get("HTTP_X_FORWARDED_FOR", environ.get("REMOTE_ADDR"))
+    payload["user_agent"] = environ.get("HTTP_USER_AGENT", "")
     save_lead(payload)
-    return redirect(url_for("thank_you"), code=302)
+    return Response(b"", status=302, headers=THANKS_REDIRECT_HEADERS)
 
 
 @app.route("/lead", methods=["POST"])
 def lead_alias():
-    return redirect(url_for("lead"), code=307)
+    # 307 keeps the POST body; headers are prebuilt at startup.
+    return Response(b"", status=307, headers=LEAD_ALIAS_HEADERS)
 
 
 @app.route("/api/newsletter", methods=["POST"])
 def newsletter_subscribe():
     email = (request.form.get("email") or "").strip()
-    if not email or "@" not in email:
+    # Byte-level checks: something before the "@", a "." after it, and at
+    # most 254 octets (the SMTP path limit).
+    raw = email.encode("utf-8")
+    at = raw.find(b"@")
+    if at <= 0 or len(raw) > 254 or raw.rfind(b".") < at:
         abort(400, "Enter a valid email.")
 
+    environ = request.environ
     payload = {
         "email": email,
         "source": (request.form.get("source") or "newsletter").strip(),
-        "ip": request.headers.get("X-Forwarded-For", request.remote_addr),
-        "user_agent": request.headers.get("User-Agent", ""),
+        "ip": environ.get("HTTP_X_FORWARDED_FOR", environ.get("REMOTE_ADDR")),
+        "user_agent": environ.get("HTTP_USER_AGENT", ""),
     }
     save_subscriber(payload)
-    return redirect(url_for("newsletter_thanks"), code=302)
+    return Response(b"", status=302, headers=NEWSLETTER_THANKS_REDIRECT_HEADERS)
+
+
+# -----------------------
+# Startup (after all routes are registered)
+# -----------------------
+# Routes never change, so templates (and the sitemap) get plain strings
+# instead of calling url_for() on every render.
+with app.test_request_context():
+    URLS = MappingProxyType(
+        {
+            endpoint: url_for(endpoint)
+            for endpoint in (
+                "home",
+                "insights",
+                "blog",
+                "start",
+                "thank_you",
+                "newsletter_thanks",
+                "privacy",
+                "terms",
+                "lead",
+                "newsletter_subscribe",
+            )
+        }
+    )
+    POST_URLS = MappingProxyType(
+        {p["slug"]: url_for("blog_post", slug=p["slug"]) for p in BLOG_POSTS}
+    )
+
+# Prebuilt redirect headers (tuples, so every response gets its own Headers).
+LEAD_ALIAS_HEADERS = (("Location", URLS["lead"]),)
+THANKS_REDIRECT_HEADERS = (("Location", URLS["thank_you"]),)
+NEWSLETTER_THANKS_REDIRECT_HEADERS = (("Location", URLS["newsletter_thanks"]),)
+
+# Canonical <link> targets for the fixed routes; blog slugs are built per hit.
+CANONICALS = {path: site_url(path) for path in URLS.values()}
+
+# Layout context that never changes after startup.
+STATIC_CTX = MappingProxyType(
+    {
+        "app_name": APP_NAME,
+        "slogan": SLOGAN,
+        "include_pixels": CONFIG.include_pixels,
+        "adsense_enabled": CONFIG.adsense_enabled,
+        "adsense_client": CONFIG.adsense_client,
+        "adsense_slot_header": CONFIG.adsense_slot_header,
+        "adsense_slot_inarticle": CONFIG.adsense_slot_inarticle,
+        "adsense_slot_sidebar": CONFIG.adsense_slot_sidebar,
+        "urls": URLS,
+        "post_urls": POST_URLS,
+    }
+)
+
+
+# Pages whose HTML only depends on startup config (blog posts included):
+# render and compress each once, then serve the stored bytes (or a 304) to
+# every visitor.
+PRECOMPRESSED_PATHS = (
+    *(
+        URLS[endpoint]
+        for endpoint in (
+            "home",
+            "insights",
+            "blog",
+            "start",
+            "privacy",
+            "terms",
+            "thank_you",
+            "newsletter_thanks",
+        )
+    ),
+    *POST_URLS.values(),
+)
+PRECOMPRESSED_PATHSET = frozenset(PRECOMPRESSED_PATHS)
+PRECOMPRESSED: dict[tuple[str, str], tuple[bytes, str]] = {}  # (path, enc) -> (body, etag)
+# With PAGE_SPOOL_DIR set, each variant is also written to a file and served
+# with send_file(), so the server can use wsgi.file_wrapper / sendfile(2)
+# (or X-Sendfile with USE_X_SENDFILE) instead of writing the bytes itself.
+SPOOL_DIR = Path(CONFIG.page_spool_dir) if CONFIG.page_spool_dir else None
+SPOOLED: dict[tuple[str, str], Path] = {}  # (path, enc) -> file
+# Names spool_page() produces: <etag>.html, plus <etag>.html.<pid>.tmp while
+# a write is in flight. Nothing else in the directory is ours to delete.
+SPOOL_NAME_RE = re.compile(r"[0-9a-f]{32}(?:-gzip|-br)?\.html(?:\.(\d+)\.tmp)?")
+COMPRESSED_ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def compress_variants(body: bytes) -> dict[str, bytes]:
+    # mtime=0 keeps the gzip bytes identical across restarts and workers.
+    variants = {"identity": body, "gzip": gzip.compress(body, 9, mtime=0)}
+    if brotli is not None:
+        variants["br"] = brotli.compress(body, quality=11)
+    return variants
+
+
+def spool_page(name: str, data: bytes) -> Path:
+    # Write then rename, so a worker never serves a half-written file.
+    path = SPOOL_DIR / name
+    tmp = path.with_name(f"{name}.{os.getpid()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+    return path
+
+
+def precompress_pages() -> None:
+    if SPOOL_DIR is not None:
+        SPOOL_DIR.mkdir(parents=True, exist_ok=True)
+    adapter = app.url_map.bind("")
+    for path in PRECOMPRESSED_PATHS:
+        endpoint, args = adapter.match(path)
+        with app.test_request_context(path):
+            html = app.view_functions[endpoint](**args).encode("utf-8")
+        digest = hashlib.blake2b(html, digest_size=16).hexdigest()
+        for enc, data in compress_variants(html).items():
+            # Each encoding is its own representation, so it gets its own tag.
+            etag = digest if enc == "identity" else f"{digest}-{enc}"
+            PRECOMPRESSED[(path, enc)] = (data, etag)
+            if SPOOL_DIR is not None:
+                SPOOLED[(path, enc)] = spool_page(f"{etag}.html", data)
+    if SPOOL_DIR is not None:
+        prune_spool()
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def prune_spool() -> None:
+    # Files are named by ETag, so every changed page leaves one behind: drop
+    # spool files this build no longer serves, and temp files whose writer
+    # has died. Files that don't match the spool naming scheme are left alone.
+    current = {p.name for p in SPOOLED.values()}
+    for entry in SPOOL_DIR.iterdir():
+        match = SPOOL_NAME_RE.fullmatch(entry.name)
+        if match is None or entry.name in current:
+            continue
+        pid = match.group(1)
+        if pid is not None and _pid_alive(int(pid)):
+            continue  # another worker is still writing it
+        entry.unlink(missing_ok=True)
+
+
+precompress_pages()
+
+
+@app.before_request
+def serve_precompressed():
+    # Runs before every request: bail out before parsing any headers unless
+    # the path is one of the cached pages.
+    if request.path not in PRECOMPRESSED_PATHSET or request.method not in ("GET", "HEAD"):
+        return None
+    enc = request.accept_encodings.best_match(COMPRESSED_ENCODINGS, default="identity")
+    cached = PRECOMPRESSED.get((request.path, enc))
+    if cached is None:
+        return None
+    body, etag = cached
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    else:
+        if request.method == "HEAD":
+            # Headers only: don't build a body (or open the spooled file).
+            response = Response(mimetype="text/html")
+            response.content_length = len(body)
+        elif SPOOL_DIR is not None:
+            response = send_file(
+                SPOOLED[(request.path, enc)], mimetype="text/html", etag=False, conditional=False
+            )
+            # A page, not a download; and the spool file's mtime is not the
+            # page's (it differs per worker without preload).
+            response.headers.remove("Content-Disposition")
+            response.headers.remove("Last-Modified")
+        else:
+            response = Response(body, mimetype="text/html")
+        if enc != "identity":
+            response.headers["Content-Encoding"] = enc
+    response.set_etag(etag)
+    response.headers["Vary"] = "Accept-Encoding"
+    response.headers["Cache-Control"] = f"public, max-age={HTML_MAX_AGE}"
+    return response
 
 
 if __name__ == "__main__":
+    # Exit through SystemExit on SIGTERM so queued CSV rows are flushed.
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
     port = int(os.getenv("PORT", "5000"))
-    app.run(host="0.0.0.0", port=port, debug=True)
+    # Development server only; production runs under gunicorn (see top).
+    # The debugger is reachable on every interface, so only an explicit
+    # "on" value enables it (Flask's own parsing treats FLASK_DEBUG=off as on).
+    debug = os.getenv("FLASK_DEBUG", "").strip().lower() in ("1", "true", "yes", "on")
+    app.run(host="0.0.0.0", port=port, debug=debug)
@@ -0,0 +1,34 @@
+"""
+Gunicorn settings for app.py (loaded automatically from the working dir).
+
+  gunicorn app:app
+
+Threaded workers keep connections alive without blocking a whole process
+per client; set GUNICORN_WORKER_CLASS=gevent (pip install gevent) for
+async workers instead.
+"""
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", str(multiprocessing.cpu_count() * 2 + 1)))
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+threads = int(os.getenv("GUNICORN_THREADS", "8"))
+
+# Import app.py once in the master: the compiled templates and pre-rendered
+# pages are built a single time and shared with every worker copy-on-write.
+# (The CSV files and flusher thread are opened lazily, per worker.)
+preload_app = True
+
+# Reuse client connections between requests.
+keepalive = 5
+
+# Heartbeat files on tmpfs, so a slow disk can't stall workers. Hosts without
+# /dev/shm (macOS, some containers) keep gunicorn's default.
+if os.path.isdir("/dev/shm"):
+    worker_tmp_dir = "/dev/shm"
+
+# Hand send_file() responses to sendfile(2) (gunicorn's default, made explicit).
+sendfile = True
+
+accesslog = "-"